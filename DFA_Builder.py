@@ -1,59 +1,72 @@
 import json
 from operator import ne
-import graphviz
 import os
 
-from IPython.core.display_functions import display
+from array import array
 from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
 
 import NFA_Deserializer as nfa_tools
 
-def BuildDFA(input_nfa_json, output_dfa_json, output_min_dfa_json):
+try:
+    # much faster than the stdlib json, especially with indentation
+    import orjson
+except ImportError:
+    orjson = None
+
+def BuildDFA(input_nfa_json, output_dfa_json, output_min_dfa_json,
+             visualize=False, verbose=True):
     try:
         # 1. Deserialize the JSON NFA
         my_nfa = nfa_tools.deserialize_nfa_json(input_nfa_json)
         print(f"Loaded NFA with {len(my_nfa.states)} states.")
-        
-        # 2. Visualize
-        dot = nfa_tools.visualize_nfa(my_nfa, output_filename="nfa_visualization")
 
-        # 3. Display in Notebook
-        display(dot)
-
-        # 4. Convert to DFA 
-        print("3. Converting NFA to DFA...")
+        # 2. Convert to DFA
+        print("2. Converting NFA to DFA...")
         my_dfa = convert_nfa_to_dfa(my_nfa)
         print(f"   -> Generated DFA with {len(my_dfa.states)} states.")
 
-        # 4. Visualize DFA
-        print("4. Visualizing DFA...")
-        visualize_graph(my_dfa, "dfa_graph", "DFA")
+        # 3. Serialize once, print on demand (dumping a huge DFA to the
+        # terminal can cost more than building it)
+        dfa_json = my_dfa.to_json()
+        if verbose:
+            print("3. DFA JSON Output:")
+            print(dfa_json)
 
-        # 5. Output JSON
-        print("5. DFA JSON Output:")
-        print(my_dfa.to_json())
-        
-        # 6. Save to file
+        # 4. Save to file
         with open(output_dfa_json, "w") as f:
-            f.write(my_dfa.to_json())
+            f.write(dfa_json)
         print("   -> Saved to json file")
 
         min_dfa = minimize_dfa(my_dfa)
         print(f"Minimized DFA has {len(min_dfa.states)} states.")
 
-        # 7. Visualize DFA
-        print("4. Visualizing Min-DFA...")
-        visualize_graph(min_dfa, "min_dfa_graph", "MIN_DFA")
+        # 5. Serialize once, print on demand
+        min_dfa_json = min_dfa.to_json()
+        if verbose:
+            print("5. MIN_DFA JSON Output:")
+            print(min_dfa_json)
 
-        # 8. Output JSON
-        print("5. MIN_DFA JSON Output:")
-        print(min_dfa.to_json())
-        
-        # 9. Save to file
+        # 6. Save to file
         with open(output_min_dfa_json, "w") as f:
-            f.write(min_dfa.to_json())
+            f.write(min_dfa_json)
         print("  -> Saved to json file")
 
+        # 7. Optionally render the three graphs. Each render shells out
+        # to the independent 'dot' binary, so they run in parallel.
+        if visualize:
+            print("7. Rendering graphs...")
+            with ThreadPoolExecutor(max_workers=3) as pool:
+                nfa_dot = pool.submit(nfa_tools.visualize_nfa, my_nfa,
+                                      "nfa_visualization")
+                pool.submit(visualize_graph, my_dfa, "dfa_graph", "DFA")
+                pool.submit(visualize_graph, min_dfa, "min_dfa_graph", "MIN_DFA")
+
+            # 8. Display in Notebook
+            from IPython.core.display_functions import display
+            display(nfa_dot.result())
+
     except Exception as e:
         print(f"Error: {e}")
 
@@ -77,9 +90,29 @@ class DFA:
             self.transitions[from_state] = {}
         self.transitions[from_state][symbol] = to_state
 
+    def to_table(self):
+        """
+        Returns a dense integer view of the DFA: (states, symbols, trans)
+        where states and symbols are sorted lists and trans is a flat
+        row-major array('i') of len(states) x len(symbols) target state
+        indices, -1 for dead (omitted) transitions.
+        """
+        states = sorted(self.states)
+        state_id = {s: i for i, s in enumerate(states)}
+        symbols = sorted({c for t in self.transitions.values() for c in t})
+        sym_col = {c: j for j, c in enumerate(symbols)}
+
+        width = len(symbols)
+        trans = array('i', [-1] * (len(states) * width))
+        for src, state_trans in self.transitions.items():
+            base = state_id[src] * width
+            for symbol, target in state_trans.items():
+                trans[base + sym_col[symbol]] = state_id[target]
+        return states, symbols, trans
+
     def to_json(self):
         """
-        Formats the DFA to the specific JSON format required 
+        Formats the DFA to the specific JSON format required
         """
         output = {
             "startingState": self.start_state
@@ -98,10 +131,24 @@ class DFA:
 
             output[state] = state_data
 
+        if orjson is not None:
+            # stdlib json with indent goes through a pure-Python
+            # formatting path; orjson serializes in C
+            return orjson.dumps(output, option=orjson.OPT_INDENT_2).decode()
         return json.dumps(output, indent=4)
 
 
 #       THE ALGORITHMS
+def _iter_bits(mask):
+    """
+    Yields the positions of the set bits in 'mask' (lowest first).
+    """
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
 def get_epsilon_closure(nfa, states_set):
     """
     Finds all states reachable from 'states_set' using only epsilon transitions.
@@ -117,7 +164,7 @@ def get_epsilon_closure(nfa, states_set):
         # Check if there are epsilon transitions from this state
         if current_state in nfa.transitions:
             for symbol, targets in nfa.transitions[current_state].items():
-                if symbol == "" or symbol.lower() == "epsilon" or symbol == "\u00ce\u00b5" or symbol == "\u03B5":
+                if symbol == nfa_tools.EPSILON:
                     #loop on all the states reachable by epsilon transition
                     for next_state in targets:
                         if next_state not in closure:
@@ -143,88 +190,242 @@ def move(nfa, states_set, symbol):
     return result_states
 
 
-def convert_nfa_to_dfa(nfa):
+def _epsilon_closure_masks(eps_adj, n):
+    """
+    Precomputes the epsilon closure of every NFA state as a bitmask.
+    Runs Tarjan's SCC algorithm on the epsilon graph (all states in one
+    SCC share the same closure), then unions successor closures while
+    SCCs are emitted in reverse topological order, so the whole thing is
+    a single pass over the graph.
+    """
+    closure = [0] * n
+    # discovery order, 1-based so 0 means "not visited yet"
+    index = [0] * n
+    low = [0] * n
+    on_stack = [False] * n
+    scc_stack = []
+    counter = 1
+
+    for root in range(n):
+        if index[root]:
+            continue
+        # iterative DFS: (node, next successor position) frames
+        work = [(root, 0)]
+        while work:
+            node, child_i = work.pop()
+            if child_i == 0:
+                index[node] = low[node] = counter
+                counter += 1
+                scc_stack.append(node)
+                on_stack[node] = True
+
+            successors = eps_adj[node]
+            descended = False
+            for i in range(child_i, len(successors)):
+                succ = successors[i]
+                if not index[succ]:
+                    # resume this frame after the child finishes
+                    work.append((node, i + 1))
+                    work.append((succ, 0))
+                    descended = True
+                    break
+                if on_stack[succ]:
+                    low[node] = min(low[node], index[succ])
+            if descended:
+                continue
+
+            if low[node] == index[node]:
+                # pop a finished SCC; every closure reachable from it
+                # is already computed (reverse topological order)
+                mask = 0
+                members = []
+                while True:
+                    member = scc_stack.pop()
+                    on_stack[member] = False
+                    members.append(member)
+                    mask |= 1 << member
+                    if member == node:
+                        break
+                for member in members:
+                    for succ in eps_adj[member]:
+                        # same-SCC successors still hold 0, already in mask
+                        mask |= closure[succ]
+                for member in members:
+                    closure[member] = mask
+            elif work:
+                # propagate the lowlink up to the parent frame
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+
+    return closure
+
+
+# per-worker copy of the fused step tables for the parallel scan below
+_worker_step_masks = None
+
+def _init_step_worker(step_masks):
+    global _worker_step_masks
+    _worker_step_masks = step_masks
+
+def _step_worker(args):
+    subset_mask, sym_id = args
+    table = _worker_step_masks[sym_id]
+    dest_mask = 0
+    for qid in _iter_bits(subset_mask):
+        dest_mask |= table[qid]
+    return dest_mask
+
+
+def convert_nfa_to_dfa(nfa, max_workers=None):
     """
     Converts an NFA object to a DFA object using Subset Construction.
+    Subsets are represented as int bitmasks (bit q set <=> NFA state q in
+    the subset): order-free, built incrementally with |= in O(1) per
+    state, and usable directly as dict keys with no canonical sorting or
+    frozenset hashing at all.
+
+    With max_workers set, the per-symbol destination masks of each
+    worklist iteration are computed on a process pool (they are
+    independent pure functions of (mask, symbol)); the state-map update
+    stays in this process. Only worth it for very large alphabets.
     """
     dfa = DFA()
 
-    # 1. Determine the Alphabet (all symbols except epsilon)
-    alphabet = set()
+    # 1. The Alphabet was already collected during deserialization
+    # (epsilon excluded, spellings canonicalized by NFA.add_transition);
+    # sort it once instead of once per worklist iteration
+    alphabet = nfa.alphabet
+    alphabet_sorted = tuple(sorted(alphabet))
+    # intern symbols to small ints so the hot loop never hashes a string
+    sym_index = {char: idx for idx, char in enumerate(alphabet_sorted)}
+
+    # 2. Give every NFA state a stable int id
+    nfa_states = sorted(nfa.states)
+    nfa_state_id = {s: i for i, s in enumerate(nfa_states)}
+    final_mask = 0
+    for s in nfa.final_states:
+        final_mask |= 1 << nfa_state_id[s]
+
+    n = len(nfa_states)
+
+    # 3. Precompute the per-state tables once: the epsilon closure of
+    # every state (via SCCs of the epsilon graph) and the move bitmask
+    # per (symbol, state)
+    eps_adj = [[] for _ in range(n)]
+    move_masks = [[0] * n for _ in alphabet_sorted]
     for src, trans in nfa.transitions.items():
-        for symbol in trans.keys():
-            if symbol != "" and symbol.lower() != "epsilon" and symbol != "\u00ce\u00b5" and symbol != "\u03B5":
-                alphabet.add(symbol)
-
-    # 2. Calculate Initial State (Start State + Epsilon Closure)
-    start_closure = get_epsilon_closure(nfa, {nfa.start_state})
-
-    # Helper to generate consistent names 
+        src_id = nfa_state_id[src]
+        for symbol, targets in trans.items():
+            if symbol == nfa_tools.EPSILON:
+                for target in targets:
+                    eps_adj[src_id].append(nfa_state_id[target])
+            else:
+                table = move_masks[sym_index[symbol]]
+                for target in targets:
+                    table[src_id] |= 1 << nfa_state_id[target]
+
+    eclose = _epsilon_closure_masks(eps_adj, n)
+
+    # fuse move and closure into one table: step_masks[c][q] is the
+    # epsilon-closed set reachable from q on c, so the whole
+    # move-then-close step for a subset is a single OR reduction
+    # (indexed by interned symbol id, not by string)
+    step_masks = []
+    for table in move_masks:
+        fused = [0] * n
+        for q in range(n):
+            combined = 0
+            for target in _iter_bits(table[q]):
+                combined |= eclose[target]
+            fused[q] = combined
+        step_masks.append(fused)
+
+    # the memoized transition function of the DFA under construction
+    @lru_cache(maxsize=None)
+    def step(subset_mask, sym_id):
+        table = step_masks[sym_id]
+        dest_mask = 0
+        for qid in _iter_bits(subset_mask):
+            dest_mask |= table[qid]
+        return dest_mask
+
+    # 4. Calculate Initial State (Start State + Epsilon Closure)
+    start_mask = eclose[nfa_state_id[nfa.start_state]]
+
+    # Helper to generate consistent names
     dfa_state_counter = 0
-    # a frozen set to store the name of the state in DFA and the corrosponding set of NFA states
+    # maps subset mask -> DFA state name
     states_map = {}
     # Queue for processing
     worklist = deque()
 
     # Setup Start State
-    start_frozen = frozenset(start_closure)
-    states_map[start_frozen] = "S0" 
-    worklist.append(start_frozen)
+    states_map[start_mask] = "S0"
+    worklist.append(start_mask)
 
     dfa.start_state = "S0"
     dfa_state_counter += 1
 
-    # Mark if start is final
-    is_start_final = any(s in nfa.final_states for s in start_closure)
-    dfa.add_state("S0", is_start_final)
-
-    # Keep track of processed states
-    processed_sets = set()
+    # Mark if start is final: one AND against the final-state mask
+    dfa.add_state("S0", (start_mask & final_mask) != 0)
 
-    # 3. Main Loop
-    while worklist:
-        current_set = worklist.popleft()
-        current_name = states_map[current_set]
+    num_syms = len(alphabet_sorted)
+    executor = None
+    if max_workers and num_syms > 1:
+        executor = ProcessPoolExecutor(max_workers=max_workers,
+                                       initializer=_init_step_worker,
+                                       initargs=(step_masks,))
 
-        if current_set in processed_sets:
-            continue
-        #mark this state as processed
-        processed_sets.add(current_set)
-
-        # For every symbol in the alphabet
-        for char in sorted(list(alphabet)):
-            # A. Move like a normal NFA move
-            move_result = move(nfa, current_set, char)
-
-            # B. Epsilon Closure again to get all states that are reachable using epsilon moves
-            final_destination_set = get_epsilon_closure(nfa, move_result)
+    try:
+        # 5. Main Loop (a mask is enqueued exactly once, when it first
+        # enters states_map, so no extra processed-set bookkeeping is
+        # needed)
+        while worklist:
+            current_mask = worklist.popleft()
+            current_name = states_map[current_mask]
+
+            # A+B. Move and Epsilon Closure per symbol, either inline or
+            # fanned out across the worker pool
+            if executor is None:
+                dest_masks = [step(current_mask, sym_id)
+                              for sym_id in range(num_syms)]
+            else:
+                dest_masks = list(executor.map(
+                    _step_worker,
+                    ((current_mask, sym_id) for sym_id in range(num_syms))))
 
-            if not final_destination_set:
-                #  Handle Dead State (Empty set) if explicit dead states are required.
-                continue
+            for sym_id, char in enumerate(alphabet_sorted):
+                dest_mask = dest_masks[sym_id]
 
-            destination_frozen = frozenset(final_destination_set)
+                if not dest_mask:
+                    #  Handle Dead State (Empty set) if explicit dead states are required.
+                    continue
 
-            # C. Check if this state was produced before
-            if destination_frozen not in states_map:
-                # Create new name
-                new_name = f"S{dfa_state_counter}"
-                states_map[destination_frozen] = new_name
-                dfa_state_counter += 1
+                # C. Check if this state was produced before
+                if dest_mask not in states_map:
+                    # Create new name
+                    new_name = f"S{dfa_state_counter}"
+                    states_map[dest_mask] = new_name
+                    dfa_state_counter += 1
 
-                # Determine if final
-                is_final = any(s in nfa.final_states for s in destination_frozen)
-                dfa.add_state(new_name, is_final)
+                    # Determine if final
+                    dfa.add_state(new_name, (dest_mask & final_mask) != 0)
 
-                # Add to worklist
-                worklist.append(destination_frozen)
+                    # Add to worklist
+                    worklist.append(dest_mask)
 
-            # D. Add Transition to the DFA Graph
-            dfa.add_transition(current_name, char, states_map[destination_frozen])
+                # D. Add Transition to the DFA Graph
+                dfa.add_transition(current_name, char, states_map[dest_mask])
+    finally:
+        if executor is not None:
+            executor.shutdown()
 
     return dfa
 def visualize_graph(automaton, filename, title):
     try:
+        # imported lazily so the converters work without graphviz
+        import graphviz
+
         dot = graphviz.Digraph(comment=title)
         dot.attr(rankdir='LR')
         for state in automaton.states:
@@ -241,108 +442,194 @@ def visualize_graph(automaton, filename, title):
                 # Handle DFA (target is string) vs NFA (target is list)
                 target_list = targets if isinstance(targets, list) else [targets]
                 for dst in target_list:
-                    label = "ε" if symbol == "" or symbol.lower() == "\u03B5" or symbol == "\u00ce\u00b5" else symbol
-                    dot.edge(src, dst, label=label)
+                    # DFA symbols are never epsilon and NFA epsilons are
+                    # already canonical, so the symbol is the label as-is
+                    dot.edge(src, dst, label=symbol)
         
         output_path = dot.render(filename, format='png', cleanup=True)
         print(f"   -> Image saved to: {output_path}")
     except Exception as e:
         print(f"   -> Graphviz error (ignore if just testing logic): {e}")
 
-def minimize_dfa(dfa):
+class _RefinablePartition:
     """
-    Minimizes a DFA using Partition Refinement (same as lecture)
+    Refinable partition backed by flat int arrays (Valmari & Lehtinen).
+
+    Each set occupies a contiguous range of 'elems'. Marking an element
+    swaps it to the front of its set's range in O(1); splitting a touched
+    set carves the marked range off into a new set with no reallocation.
     """
-    # 1. GET ALPHABET
-    alphabet = set()
-    for s in dfa.transitions:
-        for char in dfa.transitions[s]:
-            alphabet.add(char)
-    #alphabet = sorted(list(alphabet))
-    # 2. INITIAL PARTITION: [ {Non-Finals}, {Finals} ]
-    final_states = set(dfa.final_states)
-    non_final_states = dfa.states - final_states
-
-    # a list that stores all partitions
-    partitions = []
-    if non_final_states: partitions.append(non_final_states)
-    if final_states: partitions.append(final_states)
-
-    did_split_occur = True
-    while did_split_occur:
-        did_split_occur = False
-        new_partitions = []
-
-        for group in partitions:
-            if len(group) <= 1:
-                new_partitions.append(group)
-                continue
-            
-            #select the first group member as a reference state
-            group_list = list(group)
-            first = group_list[0]
-
-            #split the group into two groups one for states that match the reference transactions 
-            #and one for states that don't
-            matching_group = {first}
-            non_matching_group = set()
-
-            #helper function to get the partition the state belongs to
-            def get_partition_index(target_state,current_partitions):
-                if target_state is None:
-                    return -1
-                for idx, part in enumerate(current_partitions):
-                    if target_state in part:
-                        return idx
-                return -1
-            
-            #chack each state in the group against the reference state
-            for i in range(1, len(group_list)):
-                state = group_list[i]
-                is_matching = True
-
-                for char in alphabet:
-                    #where does the group reference go on the current input
-                    first_target = dfa.transitions.get(first, {}).get(char)
-                    #where does the current state go on the current input
-                    state_target = dfa.transitions.get(state, {}).get(char)
-                    
-                    #which group does the reference go to
-                    first_part = get_partition_index(first_target, partitions)
-                    #which group does the current state go to
-                    state_part = get_partition_index(state_target, partitions)
-
-                    if first_part != state_part:
-                        is_matching = False
-                        break
 
-                #add the state to the correct group
-                if is_matching:
-                    matching_group.add(state)
-                else:
-                    non_matching_group.add(state)
-            
-            #add the groups to the new partitions
-            if non_matching_group:
-                new_partitions.append(matching_group)
-                new_partitions.append(non_matching_group)
-                did_split_occur = True
+    def __init__(self, n):
+        self.set_count = 1 if n else 0
+        # elems = the elements, grouped by set; loc = position of each
+        # element inside elems; sidx = set index of each element
+        self.elems = array('i', range(n))
+        self.loc = array('i', range(n))
+        self.sidx = array('i', bytes(4 * n))
+        # per-set range [first, past) plus the count of marked elements
+        self.first = array('i', [0] * self.set_count)
+        self.past = array('i', [n] * self.set_count)
+        self.marked = array('i', [0] * self.set_count)
+        # sets that currently have marked elements
+        self.touched = []
+
+    def mark(self, e):
+        s = self.sidx[e]
+        i = self.loc[e]
+        j = self.first[s] + self.marked[s]
+        if i < j:
+            # already marked
+            return
+        # swap e with the first unmarked element of its set
+        other = self.elems[j]
+        self.elems[i] = other
+        self.loc[other] = i
+        self.elems[j] = e
+        self.loc[e] = j
+        if not self.marked[s]:
+            self.touched.append(s)
+        self.marked[s] += 1
+
+    def split(self):
+        while self.touched:
+            s = self.touched.pop()
+            j = self.first[s] + self.marked[s]
+            self.marked[s] = 0
+            if j == self.past[s]:
+                # every element was marked, nothing to carve off
+                continue
+            # Hopcroft's "process the smaller half": the larger of the
+            # marked range [first, j) and the rest [j, past) keeps the
+            # old set index (which may already have been processed), the
+            # smaller becomes the new set and is always processed later
+            if j - self.first[s] <= self.past[s] - j:
+                new_first, new_past = self.first[s], j
+                self.first[s] = j
             else:
-                new_partitions.append(group)
+                new_first, new_past = j, self.past[s]
+                self.past[s] = j
+            new_set = self.set_count
+            self.set_count += 1
+            self.first.append(new_first)
+            self.past.append(new_past)
+            self.marked.append(0)
+            for i in range(new_first, new_past):
+                self.sidx[self.elems[i]] = new_set
+
+
+def _csr_by_key(keys, num_buckets):
+    """
+    Counting-sorts item indices by key into a CSR layout. Returns
+    (offsets, order) where order[offsets[k]:offsets[k+1]] lists the item
+    indices whose key is k.
+    """
+    offsets = [0] * (num_buckets + 1)
+    for k in keys:
+        offsets[k + 1] += 1
+    for b in range(num_buckets):
+        offsets[b + 1] += offsets[b]
+    order = array('i', bytes(4 * len(keys)))
+    fill = list(offsets)
+    for idx, k in enumerate(keys):
+        order[fill[k]] = idx
+        fill[k] += 1
+    return offsets, order
 
-        #check for the newely updated partitions
-        partitions = new_partitions
 
-        if not did_split_occur:
-            break
-    
+def minimize_dfa(dfa):
+    """
+    Minimizes a DFA using Valmari-Lehtinen partition refinement, which
+    works directly on partial DFAs (dead transitions omitted) in
+    O(m log n) with twin refinable partitions over states and transitions.
+    """
+    # 1. ENCODE STATES AND TRANSITIONS AS CONTIGUOUS INT IDS, straight
+    # off the DFA's dense integer transition table
+    states, labels, table = dfa.to_table()
+    state_id = {s: i for i, s in enumerate(states)}
+    n = len(states)
+    width = len(labels)
+
+    tail = array('i')
+    head = array('i')
+    t_label = array('i')
+    for q in range(n):
+        base = q * width
+        for col in range(width):
+            target = table[base + col]
+            if target >= 0:
+                tail.append(q)
+                t_label.append(col)
+                head.append(target)
+    m = len(tail)
+
+    # 2. TWIN PARTITIONS: one over states, one over transitions (cords)
+    B = _RefinablePartition(n)
+    C = _RefinablePartition(m)
+
+    # initial split of the states: finals vs non-finals
+    for s in dfa.final_states:
+        B.mark(state_id[s])
+    B.split()
+
+    # group the transition partition by label (counting sort into CSR)
+    if m:
+        label_start, by_label = _csr_by_key(t_label, width)
+        for pos in range(m):
+            t = by_label[pos]
+            C.elems[pos] = t
+            C.loc[t] = pos
+        # carve one cord per label out of the sorted order
+        C.first = array('i')
+        C.past = array('i')
+        C.marked = array('i')
+        for col in range(width):
+            start, end = label_start[col], label_start[col + 1]
+            if start == end:
+                continue
+            cord = len(C.first)
+            C.first.append(start)
+            C.past.append(end)
+            C.marked.append(0)
+            for i in range(start, end):
+                C.sidx[C.elems[i]] = cord
+        C.set_count = len(C.first)
+
+    # the reverse transition function, built once in the same CSR
+    # layout: transition ids grouped by head (target) state
+    in_start, in_trans = _csr_by_key(head, n)
+
+    # 3. MAIN REFINEMENT LOOP
+    b = 1
+    c = 0
+    while c < C.set_count:
+        # split state blocks by the tails of the current cord
+        for i in range(C.first[c], C.past[c]):
+            B.mark(tail[C.elems[i]])
+        B.split()
+        c += 1
+        while b < B.set_count:
+            # split cords by the transitions entering the new state block
+            for i in range(B.first[b], B.past[b]):
+                q = B.elems[i]
+                for k in range(in_start[q], in_start[q + 1]):
+                    C.mark(in_trans[k])
+            C.split()
+            b += 1
+
+    # collect the final blocks back into sets of state names
+    partitions = [set() for _ in range(B.set_count)]
+    for q in range(n):
+        partitions[B.sidx[q]].add(states[q])
+
     # 4. reconstruct the DFA from the partitions created
     min_dfa = DFA()
     state_name_map = {}
     # add states and finish states
     for i, group in enumerate(partitions):
         new_state_name = f"S{i}"
-        is_final = any(state in dfa.final_states for state in group)
+        # C-speed set intersection instead of a Python-level any()
+        is_final = not group.isdisjoint(dfa.final_states)
         min_dfa.add_state(new_state_name, is_final)
 
         #finding the start state
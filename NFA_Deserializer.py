@@ -1,7 +1,14 @@
 import json
-import graphviz
 import os
 
+# The canonical epsilon symbol. Every accepted spelling ("", "epsilon",
+# the mojibake "Îµ" and the literal "ε") is collapsed to this one value
+# when a transition is added, so downstream code only ever compares
+# against EPSILON instead of re-checking all four forms per transition.
+EPSILON = "ε"
+_EPSILON_FORMS = frozenset({"", "epsilon", "îµ", EPSILON})
+
+
 class NFA:
     def __init__(self, start_state):
         self.start_state = start_state
@@ -9,6 +16,8 @@ class NFA:
         self.final_states = set()
         # Transitions format: {state: {symbol: [next_states]}}
         self.transitions = {}
+        # every non-epsilon symbol seen so far
+        self.alphabet = set()
 
     def add_state(self, state_name, is_final=False):
         self.states.add(state_name)
@@ -18,9 +27,15 @@ class NFA:
             self.transitions[state_name] = {}
 
     def add_transition(self, from_state, symbol, to_state):
+        # normalize any epsilon spelling to the single canonical symbol
+        if symbol.lower() in _EPSILON_FORMS:
+            symbol = EPSILON
+        else:
+            self.alphabet.add(symbol)
+
         if from_state not in self.transitions:
             self.transitions[from_state] = {}
-        
+
         if symbol not in self.transitions[from_state]:
             self.transitions[from_state][symbol] = []
             
@@ -81,6 +96,9 @@ def visualize_nfa(nfa, output_filename="nfa_graph"):
         nfa: The NFA object returned by deserialize_nfa_json
         output_filename: The base name for the output file (without extension)
     """
+    # imported lazily so deserialization works without graphviz
+    import graphviz
+
     # Create a directed graph
     dot = graphviz.Digraph(comment='NFA Graph')
     dot.attr(rankdir='LR') # Left-to-Right layout
@@ -110,12 +128,9 @@ def visualize_nfa(nfa, output_filename="nfa_graph"):
     for src, transitions in nfa.transitions.items():
         for symbol, targets in transitions.items():
             for dst in targets:
-                label = symbol
-                # Handle all epsilon variations
-                if symbol == "" or symbol.lower() == "epsilon" or symbol == "ε" or symbol == "\u00ce\u00b5":
-                    label = "ε"
-                
-                dot.edge(src, dst, label=label)
+                # epsilon is already canonicalized to EPSILON ("ε")
+                # by add_transition, so the symbol is the label as-is
+                dot.edge(src, dst, label=symbol)
 
     # Render
     output_path = dot.render(output_filename, format='png', cleanup=True)
@@ -3,71 +3,103 @@ import unittest
 
 # --- Correct Functions ---
 
+# 128-entry lookup tables for the implicit-concatenation test, indexed
+# by ord(c): CAN_END marks characters a term can end with, CAN_START
+# marks characters a term can start with. Replaces the per-character
+# isalnum() calls and 'in'-string scans in the preprocess loop.
+CAN_END = bytearray(128)
+CAN_START = bytearray(128)
+for _c in '0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ':
+    CAN_END[ord(_c)] = 1
+    CAN_START[ord(_c)] = 1
+for _c in '*?+)]':
+    CAN_END[ord(_c)] = 1
+for _c in '([':
+    CAN_START[ord(_c)] = 1
+del _c
+
+
 def preprocess(infix):
     """Adds explicit concatenation operators '.' to a regex string."""
     output = []
+    n = len(infix)
     for i, char in enumerate(infix):
         output.append(char)
-        if i + 1 < len(infix):
+        if i + 1 < n:
             next_char = infix[i + 1]
-            can_end_term = char.isalnum() or char in '*?+)]'
-            can_start_term = next_char.isalnum() or next_char in '(['
+            o1 = ord(char)
+            o2 = ord(next_char)
+            # non-ASCII falls back to isalnum(), same as before
+            can_end_term = CAN_END[o1] if o1 < 128 else char.isalnum()
+            can_start_term = CAN_START[o2] if o2 < 128 else next_char.isalnum()
             if can_end_term and can_start_term:
                 output.append('.')
     return "".join(output)
 
 
+# operator precedence as a 128-entry array indexed by ord(c), the
+# pure-Python analog of a C int table: 0 means "not an operator"
+PRECEDENCE = [0] * 128
+PRECEDENCE[ord('*')] = PRECEDENCE[ord('+')] = PRECEDENCE[ord('?')] = 5  # Quantifiers
+PRECEDENCE[ord('.')] = 4  # Concatenation
+PRECEDENCE[ord('|')] = 3  # Alternation
+
+
 def shunting_yard(infix):
     """Converts a regular expression from infix to postfix notation."""
     preprocessed_infix = preprocess(infix)
-    precedence = {
-        '*': 5, '+': 5, '?': 5,  # Quantifiers
-        '.': 4,  # Concatenation
-        '|': 3  # Alternation
-    }
-    postfix = ""
+    precedence = PRECEDENCE
+    # accumulate output pieces in a list and join once at the end;
+    # string += here is quadratic because the accumulator escapes via
+    # the postfix[-1] peek in the range logic
+    postfix = []
     stack = []
     i = 0
-    while i < len(preprocessed_infix):
+    n = len(preprocessed_infix)
+    while i < n:
         character = preprocessed_infix[i]
+        o = ord(character)
+        prec = precedence[o] if o < 128 else 0
 
         if character == "(":
             stack.append(character)
         elif character == ")":
             while stack and stack[-1] != "(":
-                postfix += stack.pop()
+                postfix.append(stack.pop())
             if stack: stack.pop()
 
-        elif character in precedence:
-            while (stack and stack[-1] not in "()" and
-                   precedence.get(stack[-1], 0) >= precedence.get(character, 0)):
-                postfix += stack.pop()
+        elif prec:
+            # the stack only ever holds '(' (precedence 0) and the five
+            # ASCII operators, so one table read replaces the dict probes
+            while stack and precedence[ord(stack[-1])] >= prec:
+                postfix.append(stack.pop())
             stack.append(character)
 
         # --- THIS IS THE CRITICAL LOGIC YOU ARE MISSING ---
         elif character == "-":
-            if not postfix or i + 1 >= len(preprocessed_infix):
-                postfix += character  # Treat as literal
+            if not postfix or i + 1 >= n:
+                postfix.append(character)  # Treat as literal
             else:
-                first_char = postfix[-1]
+                # the last piece may be multi-char, peek its last char
+                first_char = postfix[-1][-1]
                 final_char = preprocessed_infix[i + 1]
                 start_ord, end_ord = ord(first_char) + 1, ord(final_char) + 1
 
                 if start_ord < end_ord:  # Valid range (e.g., A-C)
                     char_list = ["|" + chr(num) for num in range(start_ord, end_ord)]
-                    postfix += "".join(char_list)
+                    postfix.append("".join(char_list))
                     i += 1
                 else:  # Invalid range (e.g., C-A)
-                    postfix += character
+                    postfix.append(character)
         # --- END OF CRITICAL LOGIC ---
 
         else:  # Operand
-            postfix += character
+            postfix.append(character)
         i += 1
 
     while stack:
-        postfix += stack.pop()
-    return postfix
+        postfix.append(stack.pop())
+    return "".join(postfix)
 
 
 # --- Corrected Unit Test Class ---